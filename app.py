@@ -1,7 +1,12 @@
 import os
 import logging
+import redis
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from flask_caching import Cache
+from flask_session import Session
+from jinja2 import FileSystemBytecodeCache
+from sqlalchemy import event, select
 from sqlalchemy.orm import DeclarativeBase
 from werkzeug.middleware.proxy_fix import ProxyFix
 
@@ -12,12 +17,20 @@ class Base(DeclarativeBase):
     pass
 
 db = SQLAlchemy(model_class=Base)
+cache = Cache()
 
 # create the app
 app = Flask(__name__)
 app.secret_key = os.environ.get("SESSION_SECRET", "dev-secret-key")
 app.wsgi_app = ProxyFix(app.wsgi_app, x_proto=1, x_host=1)
 
+# share compiled templates between workers and restarts instead of re-parsing them
+# (defaults to Jinja's private per-user directory under the system temp dir)
+jinja_cache_dir = os.environ.get("JINJA_CACHE_DIR")
+if jinja_cache_dir:
+    os.makedirs(jinja_cache_dir, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_dir)
+
 # configure the database
 app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("DATABASE_URL", "sqlite:///college_events.db")
 app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
@@ -25,8 +38,46 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
-# initialize the app with the extension
+# Argon2id cost (memory in KiB); defaults follow OWASP's 46 MiB / 1 iteration minimum.
+# Lower them, e.g. ARGON2_MEMORY_COST=1024, to make dev/test logins cheaper
+app.config["ARGON2_MEMORY_COST"] = int(os.environ.get("ARGON2_MEMORY_COST", 46 * 1024))
+app.config["ARGON2_TIME_COST"] = int(os.environ.get("ARGON2_TIME_COST", 1))
+
+# configure caching in Redis when REDIS_URL is set. Without it caching is off: a per-process
+# cache can't be invalidated across gunicorn workers, which would keep serving stale events
+if os.environ.get("REDIS_URL"):
+    app.config["CACHE_TYPE"] = "RedisCache"
+    app.config["CACHE_REDIS_URL"] = os.environ["REDIS_URL"]
+else:
+    app.config["CACHE_TYPE"] = "NullCache"
+    app.config["CACHE_NO_NULL_WARNING"] = True
+app.config["CACHE_DEFAULT_TIMEOUT"] = 60
+
+# keep sessions server-side in Redis when available; signed cookies otherwise
+if os.environ.get("REDIS_URL"):
+    app.config["SESSION_TYPE"] = "redis"
+    app.config["SESSION_REDIS"] = redis.Redis.from_url(os.environ["REDIS_URL"])
+    app.config["SESSION_PERMANENT"] = False
+    Session(app)
+
+# initialize the app with the extensions
 db.init_app(app)
+cache.init_app(app)
+
+# SQLite tuning: WAL lets readers run during writes, NORMAL sync skips most fsyncs,
+# writers wait up to 5s for the lock, and each connection keeps ~20 MB of hot pages
+if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+    with app.app_context():
+        @event.listens_for(db.engine, "connect")
+        def _set_sqlite_pragma(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA mmap_size=268435456")
+            cursor.execute("PRAGMA busy_timeout=5000")
+            cursor.execute("PRAGMA cache_size=-20000")
+            cursor.close()
 
 with app.app_context():
     # Import models and routes
@@ -36,20 +87,28 @@ with app.app_context():
     # Create all tables
     db.create_all()
     
-    # Create default admin if not exists
+    # create_all skips existing tables, so also add any indexes declared since they were created
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+    
+    # Create default admin if not exists. The existence check keeps the usual boot to one
+    # cheap SELECT and skips hashing; ON CONFLICT makes concurrent first boots safe
     from models import Admin
-    from werkzeug.security import generate_password_hash
+    from routes import hash_password, insert_for_dialect
     
-    if not Admin.query.filter_by(username='admin').first():
-        default_admin = Admin(
-            username='admin',
-            password_hash=generate_password_hash('admin123')
+    if db.session.scalar(select(Admin.admin_id).filter_by(username='admin')) is None:
+        result = db.session.execute(
+            insert_for_dialect(Admin)
+            .values(username='admin', password_hash=hash_password('admin123'))
+            .on_conflict_do_nothing(index_elements=['username'])
         )
-        db.session.add(default_admin)
         db.session.commit()
-        logging.info("Default admin created: username='admin', password='admin123'")
+        if result.rowcount:
+            logging.info("Default admin created: username='admin', password='admin123'")
 
 if __name__ == '__main__':
     print("Starting Flask server...")
-    app.run(host='127.0.0.1', port=5000, debug=True)
+    # Debugger and reloader only on request (FLASK_DEBUG=1); threads keep requests from queueing
+    app.run(host='127.0.0.1', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1', threaded=True)
 
@@ -0,0 +1,32 @@
+import os
+
+# Production server settings, picked up automatically by `gunicorn main:app`
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Development: GUNICORN_RELOAD=1 restarts workers on code changes. The reloader
+# can't be combined with preloading, so it runs a single worker instead.
+reload = os.environ.get("GUNICORN_RELOAD") == "1"
+
+# One process per usable core, capped at 4 by default: container CPU limits aren't visible
+# to the core count, and each worker holds its own pool and memory-hungry password hashing.
+# Each worker serves requests from a small thread pool so others can wait on the database.
+# WEB_CONCURRENCY overrides the default.
+if hasattr(os, "sched_getaffinity"):
+    usable_cpus = len(os.sched_getaffinity(0))
+else:
+    usable_cpus = os.cpu_count() or 1
+workers = 1 if reload else int(os.environ.get("WEB_CONCURRENCY", min(usable_cpus, 4)))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+
+# Import the app once in the master so table creation and the default admin
+# bootstrap run a single time instead of racing in every worker
+preload_app = not reload
+
+
+def post_fork(server, worker):
+    # Connections opened in the master during preload must not be shared with workers
+    if preload_app:
+        from app import app, db
+        with app.app_context():
+            db.engine.dispose(close=False)
@@ -1,27 +1,46 @@
 from app import db
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from functools import cached_property
+from flask import g, has_app_context
+from sqlalchemy import UniqueConstraint, select, func
+from sqlalchemy.orm import column_property
+
+def request_now():
+    # One clock reading per request, so every row is compared against the same instant
+    if not has_app_context():
+        return datetime.utcnow()
+    if 'now' not in g:
+        g.now = datetime.utcnow()
+    return g.now
 
 class Student(db.Model):
     __tablename__ = 'students'
     
     student_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    roll_number = db.Column(db.String(50), unique=True, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    roll_number = db.Column(db.String(50), nullable=False)
     department = db.Column(db.String(100), nullable=False)
-    password_hash = db.Column(db.String(256), nullable=False)
+    # Deferred: only the login views need it, so other queries don't ship it
+    password_hash = db.deferred(db.Column(db.String(256), nullable=False))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationship
-    registrations = db.relationship('Registration', backref='student', lazy=True, cascade='all, delete-orphan')
+    # Named so signup can tell which one a failed INSERT violated
+    __table_args__ = (
+        UniqueConstraint('email', name='uq_students_email'),
+        UniqueConstraint('roll_number', name='uq_students_roll_number'),
+    )
+    
+    # Relationship; raises instead of silently issuing a query per student
+    registrations = db.relationship('Registration', back_populates='student', lazy='raise_on_sql', cascade='all, delete-orphan')
 
 class Admin(db.Model):
     __tablename__ = 'admins'
     
     admin_id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(256), nullable=False)
+    # Deferred: only the login views need it, so other queries don't ship it
+    password_hash = db.deferred(db.Column(db.String(256), nullable=False))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Event(db.Model):
@@ -36,20 +55,21 @@ class Event(db.Model):
     max_participants = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationship
-    registrations = db.relationship('Registration', backref='event', lazy=True, cascade='all, delete-orphan')
+    # Upcoming-events lists filter and sort on date
+    __table_args__ = (db.Index('ix_events_date', 'date'),)
     
-    @property
-    def current_participants(self):
-        return len(self.registrations)
+    # Relationship; counts come from current_participants, so listing events never
+    # needs the rows and any stray lazy load raises instead of running per event
+    registrations = db.relationship('Registration', back_populates='event', lazy='raise_on_sql', cascade='all, delete-orphan')
     
-    @property
+    # Cached on the instance: templates read these several times per row
+    @cached_property
     def is_full(self):
         return self.current_participants >= self.max_participants
     
-    @property
+    @cached_property
     def is_past(self):
-        return self.date < datetime.utcnow()
+        return self.date < request_now()
 
 class Registration(db.Model):
     __tablename__ = 'registrations'
@@ -59,5 +79,22 @@ class Registration(db.Model):
     student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Relationships; a registration is almost always shown with its event
+    event = db.relationship('Event', back_populates='registrations', lazy='joined')
+    student = db.relationship('Student', back_populates='registrations')
+    
     # Unique constraint to prevent duplicate registrations
-    __table_args__ = (UniqueConstraint('event_id', 'student_id', name='unique_registration'),)
+    __table_args__ = (
+        UniqueConstraint('event_id', 'student_id', name='unique_registration'),
+        db.Index('ix_registrations_event_timestamp', 'event_id', 'timestamp'),
+        db.Index('ix_registrations_student_timestamp', 'student_id', 'timestamp'),
+    )
+
+# Participant count as a SQL COUNT subquery instead of loading every registration row
+Event.current_participants = column_property(
+    select(func.count(Registration.reg_id))
+    .where(Registration.event_id == Event.event_id)
+    .correlate_except(Registration)
+    .scalar_subquery(),
+    deferred=True
+)
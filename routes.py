@@ -1,9 +1,27 @@
-from flask import render_template, request, redirect, url_for, flash, session
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import render_template, request, redirect, url_for, flash, session, g, abort
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from datetime import datetime
-from app import app, db
-from models import Student, Admin, Event, Registration
+from sqlalchemy import func, text, select, lambda_stmt, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import undefer, raiseload, joinedload, lazyload, contains_eager, defer, make_transient_to_detached
+from app import app, db, cache
+from models import Student, Admin, Event, Registration, request_now
 import logging
+import os
+import hmac
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+
+# Seconds a logged-in user's row is served from the cache
+USER_CACHE_TIMEOUT = 30
+
+# Seconds the upcoming-events list is served from the cache
+UPCOMING_CACHE_TIMEOUT = 30
+UPCOMING_CACHE_KEY = 'upcoming_events'
 
 # Helper functions
 def is_student_logged_in():
@@ -13,24 +31,183 @@ def is_admin_logged_in():
     return 'admin_id' in session
 
 def get_current_student():
-    if is_student_logged_in():
-        return Student.query.get(session['student_id'])
-    return None
+    if 'current_student' not in g:
+        g.current_student = get_cached_row(Student, session['student_id']) if is_student_logged_in() else None
+    return g.current_student
 
 def get_current_admin():
+    if 'current_admin' not in g:
+        g.current_admin = get_cached_row(Admin, session['admin_id']) if is_admin_logged_in() else None
+    return g.current_admin
+
+def cached_row_key(model, pk):
+    return f'{model.__tablename__}:{pk}'
+
+def loaded_column_values(obj):
+    # Plain values of the columns already loaded on obj; ORM instances are session-bound
+    state = inspect(obj)
+    return {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs if attr.key in state.dict}
+
+def get_cached_row(model, pk):
+    # The logged-in user's row is cached briefly as plain column values and merged
+    # back into the session on a hit, so most authenticated requests skip the SELECT
+    key = cached_row_key(model, pk)
+    values = cache.get(key)
+    if values is None:
+        obj = db.session.get(model, pk)
+        if obj is not None:
+            cache.set(key, loaded_column_values(obj), timeout=USER_CACHE_TIMEOUT)
+        return obj
+    
+    obj = model(**values)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+def forget_cached_users():
+    # Drop the cached rows for whoever is logged in before the session is cleared
+    if is_student_logged_in():
+        cache.delete(cached_row_key(Student, session['student_id']))
     if is_admin_logged_in():
-        return Admin.query.get(session['admin_id'])
-    return None
+        cache.delete(cached_row_key(Admin, session['admin_id']))
+
+def get_upcoming_events(raise_on_lazy_load=False):
+    # Participant counts come back in the same SELECT instead of one query per event;
+    # lambda_stmt caches the compiled SQL, with `now` bound as a parameter on each call
+    now = request_now()
+    stmt = lambda_stmt(lambda: select(Event).where(Event.date > now).order_by(Event.date))
+    stmt += lambda s: s.options(undefer(Event.current_participants))
+    if raise_on_lazy_load:
+        stmt += lambda s: s.options(raiseload('*'))
+    return db.session.execute(stmt).scalars().all()
+
+def get_cached_upcoming_events():
+    # Shared between visitors for a few seconds and rebuilt as detached, read-only Events,
+    # so list pages skip the query; anything not already loaded raises instead of querying
+    now = request_now()
+    rows = cache.get(UPCOMING_CACHE_KEY)
+    if rows is None:
+        events = get_upcoming_events(raise_on_lazy_load=True)
+        cache.set(UPCOMING_CACHE_KEY, [loaded_column_values(event) for event in events], timeout=UPCOMING_CACHE_TIMEOUT)
+        return events
+    
+    events = []
+    for values in rows:
+        if values['date'] > now:
+            event = Event(**values)
+            make_transient_to_detached(event)
+            events.append(event)
+    return events
+
+def insert_for_dialect(model):
+    # Dialect-specific INSERT so callers can use ON CONFLICT clauses
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+def violated_unique_constraint(error):
+    # PostgreSQL reports the constraint name; SQLite reports "UNIQUE constraint failed: table.column"
+    diag = getattr(error.orig, 'diag', None)
+    if diag is not None and diag.constraint_name:
+        return diag.constraint_name
+    return str(error.orig).rsplit(': ', 1)[-1]
+
+def parse_event_date(date_str):
+    # datetime-local inputs submit 'YYYY-MM-DDTHH:MM', which fromisoformat (C-implemented) reads as is.
+    # It also takes date-only values and UTC offsets; those are rejected, since events are stored
+    # as naive datetimes and an aware one can't be compared with them
+    try:
+        parsed = datetime.fromisoformat(date_str)
+    except ValueError:
+        return None
+    if date_str[10:11] != 'T' or parsed.tzinfo is not None:
+        return None
+    return parsed
+
+def lock_event_for_registration(event_id):
+    # Serialize registrations per event so the capacity check can't race:
+    # a write lock up front on SQLite, a row lock on the event elsewhere
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(text('BEGIN IMMEDIATE'))
+    return db.get_or_404(Event, event_id, with_for_update=True)
+
+# Password helpers
+# Recently verified (hash, keyed password digest) pairs, so repeated logins skip the slow KDF
+VERIFIED_PASSWORD_CACHE_SIZE = 256
+_verified_passwords = OrderedDict()
+_verified_passwords_lock = Lock()
+
+password_hasher = PasswordHasher(
+    memory_cost=app.config['ARGON2_MEMORY_COST'],
+    time_cost=app.config['ARGON2_TIME_COST'],
+    parallelism=1
+)
+
+def hash_password(password):
+    return password_hasher.hash(password)
+
+def check_password(password_hash, password):
+    # Argon2id hashes, plus the werkzeug hashes stored before the switch
+    if password_hash.startswith('$argon2'):
+        try:
+            return password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+# Checked against when no account matches, so unknown and known logins take equally long
+DUMMY_PASSWORD_HASH = hash_password(os.urandom(16).hex())
+
+def password_needs_rehash(password_hash):
+    return not password_hash.startswith('$argon2') or password_hasher.check_needs_rehash(password_hash)
+
+def upgrade_password_hash(user, password):
+    # Re-hash legacy or outdated hashes with the current settings once the password is known good
+    if not password_needs_rehash(user.password_hash):
+        return
+    user.password_hash = hash_password(password)
+    try:
+        db.session.commit()
+    except Exception as e:
+        logging.error(f"Password rehash error: {e}")
+        db.session.rollback()
+
+def verify_password(password_hash, password):
+    digest = hmac.new(app.secret_key.encode(), password.encode(), hashlib.sha256).digest()
+    key = (password_hash, digest)
+    with _verified_passwords_lock:
+        if key in _verified_passwords:
+            _verified_passwords.move_to_end(key)
+            return True
+    
+    if not check_password(password_hash, password):
+        return False
+    
+    with _verified_passwords_lock:
+        _verified_passwords[key] = True
+        if len(_verified_passwords) > VERIFIED_PASSWORD_CACHE_SIZE:
+            _verified_passwords.popitem(last=False)
+    return True
+
+def verify_user_password(user, password):
+    if user is None:
+        check_password(DUMMY_PASSWORD_HASH, password)
+        return False
+    return verify_password(user.password_hash, password)
+
+def skip_page_cache():
+    # Only fully anonymous pages with no pending flash messages are shared between visitors
+    return is_student_logged_in() or is_admin_logged_in() or '_flashes' in session
 
 # Home page - shows events for students
 @app.route('/')
+@cache.cached(key_prefix='index_upcoming', unless=skip_page_cache)
 def index():
     if is_student_logged_in():
-        return redirect(url_for('student_dashboard'))
+        return redirect(STUDENT_DASHBOARD_URL)
     
     # Show public events list
-    upcoming_events = Event.query.filter(Event.date > datetime.utcnow()).order_by(Event.date).all()
-    return render_template('index.html', events=upcoming_events)
+    upcoming_events = get_cached_upcoming_events()
+    return render_template('index.html', events=upcoming_events, now=request_now())
 
 # Student routes
 @app.route('/signup', methods=['GET', 'POST'])
@@ -46,20 +223,11 @@ def signup():
         # Validation
         if not all([name, email, roll_number, department, password, confirm_password]):
             flash('All fields are required.', 'danger')
-            return render_template('signup.html')
+            return redirect(SIGNUP_URL)
         
         if password != confirm_password:
             flash('Passwords do not match.', 'danger')
-            return render_template('signup.html')
-        
-        # Check if email or roll number already exists
-        if Student.query.filter_by(email=email).first():
-            flash('Email already registered.', 'danger')
-            return render_template('signup.html')
-        
-        if Student.query.filter_by(roll_number=roll_number).first():
-            flash('Roll number already registered.', 'danger')
-            return render_template('signup.html')
+            return redirect(SIGNUP_URL)
         
         # Create new student
         try:
@@ -68,16 +236,29 @@ def signup():
                 email=email,
                 roll_number=roll_number,
                 department=department,
-                password_hash=generate_password_hash(password)
+                password_hash=hash_password(password)
             )
             db.session.add(student)
             db.session.commit()
             flash('Registration successful! Please log in.', 'success')
-            return redirect(url_for('login'))
+            return redirect(LOGIN_URL)
+        except IntegrityError as e:
+            # The unique constraints do the duplicate check as part of the INSERT
+            db.session.rollback()
+            violated = violated_unique_constraint(e)
+            if 'email' in violated:
+                flash('Email already registered.', 'danger')
+            elif 'roll_number' in violated:
+                flash('Roll number already registered.', 'danger')
+            else:
+                logging.error(f"Registration error: {e}")
+                flash('Registration failed. Please try again.', 'danger')
+            return redirect(SIGNUP_URL)
         except Exception as e:
             logging.error(f"Registration error: {e}")
             flash('Registration failed. Please try again.', 'danger')
             db.session.rollback()
+            return redirect(SIGNUP_URL)
     
     return render_template('signup.html')
 
@@ -89,17 +270,21 @@ def login():
         
         if not email or not password:
             flash('Email and password are required.', 'danger')
-            return render_template('login.html')
+            return redirect(LOGIN_URL)
         
-        student = Student.query.filter_by(email=email).first()
+        student = db.session.scalars(
+            select(Student).options(undefer(Student.password_hash)).filter_by(email=email)
+        ).first()
         
-        if student and check_password_hash(student.password_hash, password):
+        if verify_user_password(student, password):
+            upgrade_password_hash(student, password)
             session['student_id'] = student.student_id
             session['student_name'] = student.name
             flash(f'Welcome back, {student.name}!', 'success')
-            return redirect(url_for('student_dashboard'))
+            return redirect(STUDENT_DASHBOARD_URL)
         else:
             flash('Invalid email or password.', 'danger')
+            return redirect(LOGIN_URL)
     
     return render_template('login.html')
 
@@ -107,75 +292,95 @@ def login():
 def student_dashboard():
     if not is_student_logged_in():
         flash('Please log in to access the dashboard.', 'warning')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
     student = get_current_student()
-    upcoming_events = Event.query.filter(Event.date > datetime.utcnow()).order_by(Event.date).all()
+    upcoming_events = get_cached_upcoming_events()
     
-    # Get student's registered event IDs
-    registered_event_ids = [reg.event_id for reg in student.registrations]
+    # Get student's registered event IDs (ids only, as a set for fast lookups)
+    registered_event_ids = {
+        event_id for (event_id,) in
+        db.session.query(Registration.event_id).filter_by(student_id=session['student_id']).all()
+    }
     
     return render_template('student_dashboard.html', 
                          events=upcoming_events, 
                          registered_event_ids=registered_event_ids,
-                         student=student)
+                         student=student,
+                         now=request_now())
 
-@app.route('/register/<int:event_id>')
+# POST only so prefetchers and crawlers can't change registrations; templates must submit
+# this from a <form method="post">, a plain link now gets 405 Method Not Allowed
+@app.route('/register/<int:event_id>', methods=['POST'])
 def register_event(event_id):
     if not is_student_logged_in():
         flash('Please log in to register for events.', 'warning')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
-    student = get_current_student()
-    event = Event.query.get_or_404(event_id)
+    # Only the id is needed, and it's already in the session
+    student_id = session['student_id']
+    try:
+        event = lock_event_for_registration(event_id)
+        # Check if event is full (count in SQL rather than loading the registrations)
+        participant_count = db.session.query(func.count()).select_from(Registration).filter_by(event_id=event_id).scalar()
+    except OperationalError as e:
+        # e.g. SQLite's write lock still held by another request after the busy timeout
+        logging.error(f"Registration error: {e}")
+        flash('Registration failed. Please try again.', 'danger')
+        db.session.rollback()
+        return redirect(STUDENT_DASHBOARD_URL)
     
-    # Check if event is full
-    if event.is_full:
+    if participant_count >= event.max_participants:
         flash('Sorry, this event is full.', 'warning')
-        return redirect(url_for('student_dashboard'))
+        return redirect(STUDENT_DASHBOARD_URL)
     
     # Check if event is past
     if event.is_past:
         flash('Cannot register for past events.', 'warning')
-        return redirect(url_for('student_dashboard'))
-    
-    # Check if already registered
-    existing_registration = Registration.query.filter_by(
-        event_id=event_id, student_id=student.student_id
-    ).first()
-    
-    if existing_registration:
-        flash('You are already registered for this event.', 'info')
-        return redirect(url_for('student_dashboard'))
+        return redirect(STUDENT_DASHBOARD_URL)
     
     try:
-        registration = Registration(event_id=event_id, student_id=student.student_id)
-        db.session.add(registration)
+        # Insert unless already registered; the unique constraint makes this atomic
+        result = db.session.execute(
+            insert_for_dialect(Registration)
+            .values(event_id=event_id, student_id=student_id)
+            .on_conflict_do_nothing(index_elements=['event_id', 'student_id'])
+        )
         db.session.commit()
-        flash(f'Successfully registered for {event.title}!', 'success')
+        if result.rowcount == 0:
+            flash('You are already registered for this event.', 'info')
+        else:
+            cache.delete_many('index_upcoming', UPCOMING_CACHE_KEY)
+            flash(f'Successfully registered for {event.title}!', 'success')
     except Exception as e:
         logging.error(f"Registration error: {e}")
         flash('Registration failed. Please try again.', 'danger')
         db.session.rollback()
     
-    return redirect(url_for('student_dashboard'))
+    return redirect(STUDENT_DASHBOARD_URL)
 
 @app.route('/my-registrations')
 def my_registrations():
     if not is_student_logged_in():
         flash('Please log in to view your registrations.', 'warning')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
     student = get_current_student()
-    registrations = Registration.query.filter_by(student_id=student.student_id).order_by(Registration.timestamp.desc()).all()
+    # Events come back in the same JOINed query (the list doesn't show descriptions);
+    # anything else the template touches lazily raises instead of querying per row
+    registrations = Registration.query.options(
+        joinedload(Registration.event).defer(Event.description),
+        raiseload('*')
+    ).filter_by(student_id=student.student_id).order_by(Registration.timestamp.desc()).all()
     
     return render_template('my_registrations.html', registrations=registrations, student=student)
 
 @app.route('/logout')
 def logout():
+    forget_cached_users()
     session.clear()
     flash('You have been logged out successfully.', 'info')
-    return redirect(url_for('index'))
+    return redirect(INDEX_URL)
 
 # Admin routes
 @app.route('/admin/login', methods=['GET', 'POST'])
@@ -186,17 +391,21 @@ def admin_login():
         
         if not username or not password:
             flash('Username and password are required.', 'danger')
-            return render_template('admin_login.html')
+            return redirect(ADMIN_LOGIN_URL)
         
-        admin = Admin.query.filter_by(username=username).first()
+        admin = db.session.scalars(
+            select(Admin).options(undefer(Admin.password_hash)).filter_by(username=username)
+        ).first()
         
-        if admin and check_password_hash(admin.password_hash, password):
+        if verify_user_password(admin, password):
+            upgrade_password_hash(admin, password)
             session['admin_id'] = admin.admin_id
             session['admin_username'] = admin.username
             flash(f'Welcome back, {admin.username}!', 'success')
-            return redirect(url_for('admin_dashboard'))
+            return redirect(ADMIN_DASHBOARD_URL)
         else:
             flash('Invalid username or password.', 'danger')
+            return redirect(ADMIN_LOGIN_URL)
     
     return render_template('admin_login.html')
 
@@ -204,16 +413,20 @@ def admin_login():
 def admin_dashboard():
     if not is_admin_logged_in():
         flash('Please log in as admin to access the dashboard.', 'warning')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
-    events = Event.query.order_by(Event.date.desc()).all()
-    return render_template('admin_dashboard.html', events=events)
+    # Undeferred so the participant counts come back with the events instead of one query each;
+    # the management table doesn't show descriptions, so those stay in the database
+    events = Event.query.options(
+        undefer(Event.current_participants), defer(Event.description)
+    ).order_by(Event.date.desc()).all()
+    return render_template('admin_dashboard.html', events=events, now=request_now())
 
 @app.route('/admin/add-event', methods=['GET', 'POST'])
 def add_event():
     if not is_admin_logged_in():
         flash('Please log in as admin to add events.', 'warning')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
     if request.method == 'POST':
         title = request.form.get('title')
@@ -225,13 +438,19 @@ def add_event():
         
         if not all([title, description, date_str, venue, department, max_participants]):
             flash('All fields are required.', 'danger')
-            return render_template('add_event.html')
+            return redirect(ADD_EVENT_URL)
+        
+        if not max_participants.isdecimal():
+            flash('Invalid date format or participant count.', 'danger')
+            return redirect(ADD_EVENT_URL)
+        max_participants = int(max_participants)
+        
+        event_date = parse_event_date(date_str)
+        if event_date is None:
+            flash('Invalid date format or participant count.', 'danger')
+            return redirect(ADD_EVENT_URL)
         
         try:
-            # Parse the datetime
-            event_date = datetime.fromisoformat(date_str.replace('T', ' '))
-            max_participants = int(max_participants)
-            
             event = Event(
                 title=title,
                 description=description,
@@ -242,14 +461,14 @@ def add_event():
             )
             db.session.add(event)
             db.session.commit()
+            cache.delete_many('index_upcoming', UPCOMING_CACHE_KEY)
             flash('Event added successfully!', 'success')
-            return redirect(url_for('admin_dashboard'))
-        except ValueError:
-            flash('Invalid date format or participant count.', 'danger')
+            return redirect(ADMIN_DASHBOARD_URL)
         except Exception as e:
             logging.error(f"Add event error: {e}")
             flash('Failed to add event. Please try again.', 'danger')
             db.session.rollback()
+            return redirect(ADD_EVENT_URL)
     
     return render_template('add_event.html')
 
@@ -257,9 +476,9 @@ def add_event():
 def edit_event(event_id):
     if not is_admin_logged_in():
         flash('Please log in as admin to edit events.', 'warning')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
-    event = Event.query.get_or_404(event_id)
+    event = db.get_or_404(Event, event_id)
     
     if request.method == 'POST':
         title = request.form.get('title')
@@ -271,13 +490,19 @@ def edit_event(event_id):
         
         if not all([title, description, date_str, venue, department, max_participants]):
             flash('All fields are required.', 'danger')
-            return render_template('edit_event.html', event=event)
+            return redirect(url_for('edit_event', event_id=event_id))
+        
+        if not max_participants.isdecimal():
+            flash('Invalid date format or participant count.', 'danger')
+            return redirect(url_for('edit_event', event_id=event_id))
+        max_participants = int(max_participants)
+        
+        event_date = parse_event_date(date_str)
+        if event_date is None:
+            flash('Invalid date format or participant count.', 'danger')
+            return redirect(url_for('edit_event', event_id=event_id))
         
         try:
-            # Parse the datetime
-            event_date = datetime.fromisoformat(date_str.replace('T', ' '))
-            max_participants = int(max_participants)
-            
             event.title = title
             event.description = description
             event.date = event_date
@@ -286,14 +511,14 @@ def edit_event(event_id):
             event.max_participants = max_participants
             
             db.session.commit()
+            cache.delete_many('index_upcoming', UPCOMING_CACHE_KEY)
             flash('Event updated successfully!', 'success')
-            return redirect(url_for('admin_dashboard'))
-        except ValueError:
-            flash('Invalid date format or participant count.', 'danger')
+            return redirect(ADMIN_DASHBOARD_URL)
         except Exception as e:
             logging.error(f"Edit event error: {e}")
             flash('Failed to update event. Please try again.', 'danger')
             db.session.rollback()
+            return redirect(url_for('edit_event', event_id=event_id))
     
     return render_template('edit_event.html', event=event)
 
@@ -301,34 +526,65 @@ def edit_event(event_id):
 def delete_event(event_id):
     if not is_admin_logged_in():
         flash('Please log in as admin to delete events.', 'warning')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
-    event = Event.query.get_or_404(event_id)
+    event = db.get_or_404(Event, event_id)
     
     try:
         db.session.delete(event)
         db.session.commit()
+        cache.delete_many('index_upcoming', UPCOMING_CACHE_KEY)
         flash(f'Event "{event.title}" deleted successfully!', 'success')
     except Exception as e:
         logging.error(f"Delete event error: {e}")
         flash('Failed to delete event. Please try again.', 'danger')
         db.session.rollback()
     
-    return redirect(url_for('admin_dashboard'))
+    return redirect(ADMIN_DASHBOARD_URL)
 
 @app.route('/admin/event/<int:event_id>/participants')
 def view_participants(event_id):
     if not is_admin_logged_in():
         flash('Please log in as admin to view participants.', 'warning')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
-    event = Event.query.get_or_404(event_id)
-    registrations = Registration.query.filter_by(event_id=event_id).order_by(Registration.timestamp).all()
+    # The event, its registrations and their students in one round trip (outer joins, so an
+    # event without registrations still loads), fetching only the student columns the list shows;
+    # registration.event then resolves from the identity map instead of joining events again
+    event = db.session.execute(
+        select(Event)
+        .outerjoin(Event.registrations)
+        .outerjoin(Registration.student)
+        .options(
+            contains_eager(Event.registrations).options(
+                contains_eager(Registration.student).load_only(
+                    Student.name, Student.roll_number, Student.email, Student.department
+                ),
+                lazyload(Registration.event)
+            )
+        )
+        .where(Event.event_id == event_id)
+        .order_by(Registration.timestamp)
+    ).unique().scalar_one_or_none()
+    if event is None:
+        abort(404)
+    registrations = event.registrations
     
     return render_template('participants.html', event=event, registrations=registrations)
 
 @app.route('/admin/logout')
 def admin_logout():
+    forget_cached_users()
     session.clear()
     flash('You have been logged out successfully.', 'info')
-    return redirect(url_for('admin_login'))
+    return redirect(ADMIN_LOGIN_URL)
+
+# Redirect targets without URL parameters, resolved once instead of on every redirect
+with app.test_request_context():
+    INDEX_URL = url_for('index')
+    SIGNUP_URL = url_for('signup')
+    LOGIN_URL = url_for('login')
+    STUDENT_DASHBOARD_URL = url_for('student_dashboard')
+    ADMIN_LOGIN_URL = url_for('admin_login')
+    ADMIN_DASHBOARD_URL = url_for('admin_dashboard')
+    ADD_EVENT_URL = url_for('add_event')
@@ -1,11 +1,20 @@
 import os
 import logging
-from flask import Flask, render_template, request, redirect, url_for, flash, session
+import hmac
+import hashlib
+from collections import OrderedDict
+from threading import Lock
+from flask import Flask, render_template, request, redirect, url_for, flash, session, g, abort, has_app_context
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.orm import DeclarativeBase
-from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy.orm import DeclarativeBase, column_property, undefer, raiseload, joinedload, lazyload, contains_eager, defer
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from datetime import datetime
-from sqlalchemy import UniqueConstraint
+from functools import cached_property
+from sqlalchemy import UniqueConstraint, select, insert, func, event, text, lambda_stmt
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, OperationalError
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -26,30 +35,66 @@ app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
     "pool_pre_ping": True,
 }
 
+# Argon2id cost (memory in KiB); defaults follow OWASP's 46 MiB / 1 iteration minimum.
+# Lower them, e.g. ARGON2_MEMORY_COST=1024, to make dev/test logins cheaper
+app.config["ARGON2_MEMORY_COST"] = int(os.environ.get("ARGON2_MEMORY_COST", 46 * 1024))
+app.config["ARGON2_TIME_COST"] = int(os.environ.get("ARGON2_TIME_COST", 1))
+
 # Initialize the app with the extension
 db.init_app(app)
 
+# SQLite tuning: WAL lets readers run during writes, NORMAL sync skips most fsyncs,
+# writers wait up to 5s for the lock, and each connection keeps ~20 MB of hot pages
+if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+    with app.app_context():
+        @event.listens_for(db.engine, "connect")
+        def _set_sqlite_pragma(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA mmap_size=268435456")
+            cursor.execute("PRAGMA busy_timeout=5000")
+            cursor.execute("PRAGMA cache_size=-20000")
+            cursor.close()
+
+def request_now():
+    # One clock reading per request, so every row is compared against the same instant
+    if not has_app_context():
+        return datetime.utcnow()
+    if 'now' not in g:
+        g.now = datetime.utcnow()
+    return g.now
+
 # Define Models
 class Student(db.Model):
     __tablename__ = 'students'
     
     student_id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
-    roll_number = db.Column(db.String(50), unique=True, nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    roll_number = db.Column(db.String(50), nullable=False)
     department = db.Column(db.String(100), nullable=False)
-    password_hash = db.Column(db.String(256), nullable=False)
+    # Deferred: only the login views need it, so other queries don't ship it
+    password_hash = db.deferred(db.Column(db.String(256), nullable=False))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationship
-    registrations = db.relationship('Registration', backref='student', lazy=True, cascade='all, delete-orphan')
+    # Named so signup can tell which one a failed INSERT violated
+    __table_args__ = (
+        UniqueConstraint('email', name='uq_students_email'),
+        UniqueConstraint('roll_number', name='uq_students_roll_number'),
+    )
+    
+    # Relationship; raises instead of silently issuing a query per student
+    registrations = db.relationship('Registration', back_populates='student', lazy='raise_on_sql', cascade='all, delete-orphan')
 
 class Admin(db.Model):
     __tablename__ = 'admins'
     
     admin_id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
-    password_hash = db.Column(db.String(256), nullable=False)
+    # Deferred: only the login views need it, so other queries don't ship it
+    password_hash = db.deferred(db.Column(db.String(256), nullable=False))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 class Event(db.Model):
@@ -64,20 +109,21 @@ class Event(db.Model):
     max_participants = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
-    # Relationship
-    registrations = db.relationship('Registration', backref='event', lazy=True, cascade='all, delete-orphan')
+    # Upcoming-events lists filter and sort on date
+    __table_args__ = (db.Index('ix_events_date', 'date'),)
     
-    @property
-    def current_participants(self):
-        return len(self.registrations)
+    # Relationship; counts come from current_participants, so listing events never
+    # needs the rows and any stray lazy load raises instead of running per event
+    registrations = db.relationship('Registration', back_populates='event', lazy='raise_on_sql', cascade='all, delete-orphan')
     
-    @property
+    # Cached on the instance: templates read these several times per row
+    @cached_property
     def is_full(self):
         return self.current_participants >= self.max_participants
     
-    @property
+    @cached_property
     def is_past(self):
-        return self.date < datetime.utcnow()
+        return self.date < request_now()
 
 class Registration(db.Model):
     __tablename__ = 'registrations'
@@ -87,8 +133,25 @@ class Registration(db.Model):
     student_id = db.Column(db.Integer, db.ForeignKey('students.student_id'), nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
+    # Relationships; a registration is almost always shown with its event
+    event = db.relationship('Event', back_populates='registrations', lazy='joined')
+    student = db.relationship('Student', back_populates='registrations')
+    
     # Unique constraint to prevent duplicate registrations
-    __table_args__ = (UniqueConstraint('event_id', 'student_id', name='unique_registration'),)
+    __table_args__ = (
+        UniqueConstraint('event_id', 'student_id', name='unique_registration'),
+        db.Index('ix_registrations_event_timestamp', 'event_id', 'timestamp'),
+        db.Index('ix_registrations_student_timestamp', 'student_id', 'timestamp'),
+    )
+
+# Participant count as a SQL COUNT subquery instead of loading every registration row
+Event.current_participants = column_property(
+    select(func.count(Registration.reg_id))
+    .where(Registration.event_id == Event.event_id)
+    .correlate_except(Registration)
+    .scalar_subquery(),
+    deferred=True
+)
 
 # Helper functions
 def is_student_logged_in():
@@ -98,24 +161,130 @@ def is_admin_logged_in():
     return 'admin_id' in session
 
 def get_current_student():
-    if is_student_logged_in():
-        return Student.query.get(session['student_id'])
-    return None
+    if 'current_student' not in g:
+        g.current_student = db.session.get(Student, session['student_id']) if is_student_logged_in() else None
+    return g.current_student
 
 def get_current_admin():
-    if is_admin_logged_in():
-        return Admin.query.get(session['admin_id'])
-    return None
+    if 'current_admin' not in g:
+        g.current_admin = db.session.get(Admin, session['admin_id']) if is_admin_logged_in() else None
+    return g.current_admin
+
+def get_upcoming_events(raise_on_lazy_load=False):
+    # Participant counts come back in the same SELECT instead of one query per event;
+    # lambda_stmt caches the compiled SQL, with `now` bound as a parameter on each call
+    now = request_now()
+    stmt = lambda_stmt(lambda: select(Event).where(Event.date > now).order_by(Event.date))
+    stmt += lambda s: s.options(undefer(Event.current_participants))
+    if raise_on_lazy_load:
+        stmt += lambda s: s.options(raiseload('*'))
+    return db.session.execute(stmt).scalars().all()
+
+def violated_unique_constraint(error):
+    # PostgreSQL reports the constraint name; SQLite reports "UNIQUE constraint failed: table.column"
+    diag = getattr(error.orig, 'diag', None)
+    if diag is not None and diag.constraint_name:
+        return diag.constraint_name
+    return str(error.orig).rsplit(': ', 1)[-1]
+
+def parse_event_date(date_str):
+    # datetime-local inputs submit 'YYYY-MM-DDTHH:MM', which fromisoformat (C-implemented) reads as is.
+    # It also takes date-only values and UTC offsets; those are rejected, since events are stored
+    # as naive datetimes and an aware one can't be compared with them
+    try:
+        parsed = datetime.fromisoformat(date_str)
+    except ValueError:
+        return None
+    if date_str[10:11] != 'T' or parsed.tzinfo is not None:
+        return None
+    return parsed
+
+def insert_for_dialect(model):
+    # Dialect-specific INSERT so callers can use ON CONFLICT clauses
+    if db.engine.dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+def lock_event_for_registration(event_id):
+    # Serialize registrations per event so the capacity check can't race:
+    # a write lock up front on SQLite, a row lock on the event elsewhere
+    if db.engine.dialect.name == 'sqlite':
+        db.session.execute(text('BEGIN IMMEDIATE'))
+    return db.get_or_404(Event, event_id, with_for_update=True)
+
+# Password helpers
+# Recently verified (hash, keyed password digest) pairs, so repeated logins skip the slow KDF
+VERIFIED_PASSWORD_CACHE_SIZE = 256
+_verified_passwords = OrderedDict()
+_verified_passwords_lock = Lock()
+
+password_hasher = PasswordHasher(
+    memory_cost=app.config['ARGON2_MEMORY_COST'],
+    time_cost=app.config['ARGON2_TIME_COST'],
+    parallelism=1
+)
+
+def hash_password(password):
+    return password_hasher.hash(password)
+
+def check_password(password_hash, password):
+    # Argon2id hashes, plus the werkzeug hashes stored before the switch
+    if password_hash.startswith('$argon2'):
+        try:
+            return password_hasher.verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+# Checked against when no account matches, so unknown and known logins take equally long
+DUMMY_PASSWORD_HASH = hash_password(os.urandom(16).hex())
+
+def password_needs_rehash(password_hash):
+    return not password_hash.startswith('$argon2') or password_hasher.check_needs_rehash(password_hash)
+
+def upgrade_password_hash(user, password):
+    # Re-hash legacy or outdated hashes with the current settings once the password is known good
+    if not password_needs_rehash(user.password_hash):
+        return
+    user.password_hash = hash_password(password)
+    try:
+        db.session.commit()
+    except Exception as e:
+        logging.error(f"Password rehash error: {e}")
+        db.session.rollback()
+
+def verify_password(password_hash, password):
+    digest = hmac.new(app.secret_key.encode(), password.encode(), hashlib.sha256).digest()
+    key = (password_hash, digest)
+    with _verified_passwords_lock:
+        if key in _verified_passwords:
+            _verified_passwords.move_to_end(key)
+            return True
+    
+    if not check_password(password_hash, password):
+        return False
+    
+    with _verified_passwords_lock:
+        _verified_passwords[key] = True
+        if len(_verified_passwords) > VERIFIED_PASSWORD_CACHE_SIZE:
+            _verified_passwords.popitem(last=False)
+    return True
+
+def verify_user_password(user, password):
+    if user is None:
+        check_password(DUMMY_PASSWORD_HASH, password)
+        return False
+    return verify_password(user.password_hash, password)
 
 # Routes
 @app.route('/')
 def index():
     if is_student_logged_in():
-        return redirect(url_for('student_dashboard'))
+        return redirect(STUDENT_DASHBOARD_URL)
     
     # Show public events list
-    upcoming_events = Event.query.filter(Event.date > datetime.utcnow()).order_by(Event.date).all()
-    return render_template('index.html', events=upcoming_events)
+    upcoming_events = get_upcoming_events()
+    return render_template('index.html', events=upcoming_events, now=request_now())
 
 # Student routes
 @app.route('/signup', methods=['GET', 'POST'])
@@ -131,20 +300,11 @@ def signup():
         # Validation
         if not all([name, email, roll_number, department, password, confirm_password]):
             flash('All fields are required.', 'error')
-            return render_template('signup.html')
+            return redirect(SIGNUP_URL)
         
         if password != confirm_password:
             flash('Passwords do not match.', 'error')
-            return render_template('signup.html')
-        
-        # Check if email or roll number already exists
-        if Student.query.filter_by(email=email).first():
-            flash('Email already registered.', 'error')
-            return render_template('signup.html')
-        
-        if Student.query.filter_by(roll_number=roll_number).first():
-            flash('Roll number already registered.', 'error')
-            return render_template('signup.html')
+            return redirect(SIGNUP_URL)
         
         # Create new student
         student = Student(
@@ -152,18 +312,31 @@ def signup():
             email=email,
             roll_number=roll_number,
             department=department,
-            password_hash=generate_password_hash(password)
+            password_hash=hash_password(password)
         )
         
         try:
             db.session.add(student)
             db.session.commit()
             flash('Registration successful! Please login.', 'success')
-            return redirect(url_for('login'))
+            return redirect(LOGIN_URL)
+        except IntegrityError as e:
+            # The unique constraints do the duplicate check as part of the INSERT
+            db.session.rollback()
+            violated = violated_unique_constraint(e)
+            if 'email' in violated:
+                flash('Email already registered.', 'error')
+            elif 'roll_number' in violated:
+                flash('Roll number already registered.', 'error')
+            else:
+                logging.error(f"Registration error: {e}")
+                flash('Registration failed. Please try again.', 'error')
+            return redirect(SIGNUP_URL)
         except Exception as e:
             db.session.rollback()
             logging.error(f"Error creating student: {e}")
             flash('Registration failed. Please try again.', 'error')
+            return redirect(SIGNUP_URL)
     
     return render_template('signup.html')
 
@@ -175,17 +348,21 @@ def login():
         
         if not email or not password:
             flash('Email and password are required.', 'error')
-            return render_template('login.html')
+            return redirect(LOGIN_URL)
         
-        student = Student.query.filter_by(email=email).first()
+        student = db.session.scalars(
+            select(Student).options(undefer(Student.password_hash)).filter_by(email=email)
+        ).first()
         
-        if student and check_password_hash(student.password_hash, password):
+        if verify_user_password(student, password):
+            upgrade_password_hash(student, password)
             session['student_id'] = student.student_id
             session['student_name'] = student.name
             flash(f'Welcome back, {student.name}!', 'success')
-            return redirect(url_for('student_dashboard'))
+            return redirect(STUDENT_DASHBOARD_URL)
         else:
             flash('Invalid email or password.', 'error')
+            return redirect(LOGIN_URL)
     
     return render_template('login.html')
 
@@ -193,88 +370,96 @@ def login():
 def student_dashboard():
     if not is_student_logged_in():
         flash('Please login to access your dashboard.', 'error')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
     student = get_current_student()
     if not student:
         session.clear()
         flash('Session expired. Please login again.', 'error')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
     # Get upcoming events
-    upcoming_events = Event.query.filter(Event.date > datetime.utcnow()).order_by(Event.date).all()
+    upcoming_events = get_upcoming_events(raise_on_lazy_load=True)
     
-    # Get student's registrations
-    registered_event_ids = [reg.event_id for reg in student.registrations]
+    # Get student's registered event IDs (ids only, as a set for fast lookups)
+    registered_event_ids = {
+        event_id for (event_id,) in
+        db.session.query(Registration.event_id).filter_by(student_id=session['student_id']).all()
+    }
     
     return render_template('student_dashboard.html', 
                          student=student, 
                          events=upcoming_events,
-                         registered_event_ids=registered_event_ids)
+                         registered_event_ids=registered_event_ids,
+                         now=request_now())
 
-@app.route('/student/register/<int:event_id>')
+# POST only so prefetchers and crawlers can't change registrations; templates must submit
+# this from a <form method="post">, a plain link now gets 405 Method Not Allowed
+@app.route('/student/register/<int:event_id>', methods=['POST'])
 def register_event(event_id):
     if not is_student_logged_in():
         flash('Please login to register for events.', 'error')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
-    student = get_current_student()
-    event = Event.query.get_or_404(event_id)
+    # Only the id is needed, and it's already in the session
+    student_id = session['student_id']
+    try:
+        event = lock_event_for_registration(event_id)
+        # Check if event is full (count in SQL rather than loading the registrations)
+        participant_count = db.session.query(func.count()).select_from(Registration).filter_by(event_id=event_id).scalar()
+    except OperationalError as e:
+        # e.g. SQLite's write lock still held by another request after the busy timeout
+        db.session.rollback()
+        logging.error(f"Error registering student: {e}")
+        flash('Registration failed. Please try again.', 'error')
+        return redirect(STUDENT_DASHBOARD_URL)
     
-    # Check if event is full
-    if event.is_full:
+    if participant_count >= event.max_participants:
         flash('Sorry, this event is full.', 'error')
-        return redirect(url_for('student_dashboard'))
+        return redirect(STUDENT_DASHBOARD_URL)
     
     # Check if event is in the past
     if event.is_past:
         flash('Cannot register for past events.', 'error')
-        return redirect(url_for('student_dashboard'))
-    
-    # Check if already registered
-    existing_registration = Registration.query.filter_by(
-        event_id=event_id, 
-        student_id=student.student_id
-    ).first()
-    
-    if existing_registration:
-        flash('You are already registered for this event.', 'warning')
-        return redirect(url_for('student_dashboard'))
-    
-    # Create registration
-    registration = Registration(
-        event_id=event_id,
-        student_id=student.student_id
-    )
+        return redirect(STUDENT_DASHBOARD_URL)
     
     try:
-        db.session.add(registration)
+        # Insert unless already registered; the unique constraint makes this atomic
+        result = db.session.execute(
+            insert_for_dialect(Registration)
+            .values(event_id=event_id, student_id=student_id)
+            .on_conflict_do_nothing(index_elements=['event_id', 'student_id'])
+        )
         db.session.commit()
-        flash(f'Successfully registered for {event.title}!', 'success')
+        if result.rowcount == 0:
+            flash('You are already registered for this event.', 'warning')
+        else:
+            flash(f'Successfully registered for {event.title}!', 'success')
     except Exception as e:
         db.session.rollback()
         logging.error(f"Error registering student: {e}")
         flash('Registration failed. Please try again.', 'error')
     
-    return redirect(url_for('student_dashboard'))
+    return redirect(STUDENT_DASHBOARD_URL)
 
-@app.route('/student/unregister/<int:event_id>')
+# POST only so prefetchers and crawlers can't change registrations; templates must submit
+# this from a <form method="post">, a plain link now gets 405 Method Not Allowed
+@app.route('/student/unregister/<int:event_id>', methods=['POST'])
 def unregister_event(event_id):
     if not is_student_logged_in():
         flash('Please login to manage your registrations.', 'error')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
-    student = get_current_student()
     registration = Registration.query.filter_by(
         event_id=event_id, 
-        student_id=student.student_id
+        student_id=session['student_id']
     ).first()
     
     if not registration:
         flash('You are not registered for this event.', 'error')
-        return redirect(url_for('my_registrations'))
+        return redirect(MY_REGISTRATIONS_URL)
     
-    event = Event.query.get(event_id)
+    event = db.session.get(Event, event_id)
     
     try:
         db.session.delete(registration)
@@ -285,22 +470,26 @@ def unregister_event(event_id):
         logging.error(f"Error unregistering student: {e}")
         flash('Unregistration failed. Please try again.', 'error')
     
-    return redirect(url_for('my_registrations'))
+    return redirect(MY_REGISTRATIONS_URL)
 
 @app.route('/student/registrations')
 def my_registrations():
     if not is_student_logged_in():
         flash('Please login to view your registrations.', 'error')
-        return redirect(url_for('login'))
+        return redirect(LOGIN_URL)
     
     student = get_current_student()
     if not student:
         session.clear()
         flash('Session expired. Please login again.', 'error')
-        return redirect(url_for('login'))
-    
-    # Get student's registrations using the relationship - this will work with your template
-    registrations = Registration.query.filter_by(student_id=student.student_id).order_by(
+        return redirect(LOGIN_URL)
+    
+    # Get student's registrations with their events in the same JOINed query (the list
+    # doesn't show descriptions); other lazy loads raise instead of querying per row
+    registrations = Registration.query.options(
+        joinedload(Registration.event).defer(Event.description),
+        raiseload('*')
+    ).filter_by(student_id=student.student_id).order_by(
         Registration.timestamp.desc()
     ).all()
     
@@ -322,17 +511,21 @@ def admin_login():
         
         if not username or not password:
             flash('Username and password are required.', 'error')
-            return render_template('admin_login.html')
+            return redirect(ADMIN_LOGIN_URL)
         
-        admin = Admin.query.filter_by(username=username).first()
+        admin = db.session.scalars(
+            select(Admin).options(undefer(Admin.password_hash)).filter_by(username=username)
+        ).first()
         
-        if admin and check_password_hash(admin.password_hash, password):
+        if verify_user_password(admin, password):
+            upgrade_password_hash(admin, password)
             session['admin_id'] = admin.admin_id
             session['admin_username'] = admin.username
             flash(f'Welcome, {admin.username}!', 'success')
-            return redirect(url_for('admin_dashboard'))
+            return redirect(ADMIN_DASHBOARD_URL)
         else:
             flash('Invalid username or password.', 'error')
+            return redirect(ADMIN_LOGIN_URL)
     
     return render_template('admin_login.html')
 
@@ -340,22 +533,31 @@ def admin_login():
 def admin_dashboard():
     if not is_admin_logged_in():
         flash('Please login to access admin dashboard.', 'error')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
     admin = get_current_admin()
     if not admin:
         session.clear()
         flash('Session expired. Please login again.', 'error')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
-    # Get all events with registration counts
-    events = Event.query.order_by(Event.date).all()
+    # Get all events with registration counts, counted in the same SELECT; the management
+    # table doesn't show descriptions, so those stay in the database
+    events = Event.query.options(
+        undefer(Event.current_participants), defer(Event.description)
+    ).order_by(Event.date).all()
     
     # Get statistics
     total_events = len(events)
-    total_students = Student.query.count()
-    total_registrations = Registration.query.count()
-    upcoming_events = len([e for e in events if e.date > datetime.utcnow()])
+    # Both table counts in a single round trip
+    counts = db.session.execute(select(
+        select(func.count()).select_from(Student).scalar_subquery().label('students'),
+        select(func.count()).select_from(Registration).scalar_subquery().label('registrations')
+    )).one()
+    total_students = counts.students
+    total_registrations = counts.registrations
+    now = request_now()
+    upcoming_events = sum(1 for e in events if e.date > now)
     
     stats = {
         'total_events': total_events,
@@ -364,13 +566,13 @@ def admin_dashboard():
         'upcoming_events': upcoming_events
     }
     
-    return render_template('admin_dashboard.html', events=events, admin=admin, stats=stats)
+    return render_template('admin_dashboard.html', events=events, admin=admin, stats=stats, now=now)
 
 @app.route('/admin/events/add', methods=['GET', 'POST'])
 def add_event():
     if not is_admin_logged_in():
         flash('Please login to access admin features.', 'error')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
     if request.method == 'POST':
         title = request.form.get('title')
@@ -383,23 +585,25 @@ def add_event():
         # Validation
         if not all([title, description, date_str, venue, department, max_participants]):
             flash('All fields are required.', 'error')
-            return render_template('add_event.html')
+            return redirect(ADD_EVENT_URL)
         
-        try:
-            event_date = datetime.strptime(date_str, '%Y-%m-%dT%H:%M')
-            max_participants = int(max_participants)
-            
-            if max_participants < 1:
-                flash('Maximum participants must be at least 1.', 'error')
-                return render_template('add_event.html')
-            
-            if event_date <= datetime.utcnow():
-                flash('Event date must be in the future.', 'error')
-                return render_template('add_event.html')
-            
-        except ValueError:
+        if not max_participants.isdecimal():
             flash('Invalid date format or participant count.', 'error')
-            return render_template('add_event.html')
+            return redirect(ADD_EVENT_URL)
+        max_participants = int(max_participants)
+        
+        event_date = parse_event_date(date_str)
+        if event_date is None:
+            flash('Invalid date format or participant count.', 'error')
+            return redirect(ADD_EVENT_URL)
+        
+        if max_participants < 1:
+            flash('Maximum participants must be at least 1.', 'error')
+            return redirect(ADD_EVENT_URL)
+        
+        if event_date <= datetime.utcnow():
+            flash('Event date must be in the future.', 'error')
+            return redirect(ADD_EVENT_URL)
         
         # Create new event
         event = Event(
@@ -415,11 +619,12 @@ def add_event():
             db.session.add(event)
             db.session.commit()
             flash(f'Event "{title}" created successfully!', 'success')
-            return redirect(url_for('admin_dashboard'))
+            return redirect(ADMIN_DASHBOARD_URL)
         except Exception as e:
             db.session.rollback()
             logging.error(f"Error creating event: {e}")
             flash('Failed to create event. Please try again.', 'error')
+            return redirect(ADD_EVENT_URL)
     
     return render_template('add_event.html')
 
@@ -427,9 +632,9 @@ def add_event():
 def edit_event(event_id):
     if not is_admin_logged_in():
         flash('Please login to access admin features.', 'error')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
-    event = Event.query.get_or_404(event_id)
+    event = db.get_or_404(Event, event_id)
     
     if request.method == 'POST':
         title = request.form.get('title')
@@ -442,24 +647,26 @@ def edit_event(event_id):
         # Validation
         if not all([title, description, date_str, venue, department, max_participants]):
             flash('All fields are required.', 'error')
-            return render_template('edit_event.html', event=event)
+            return redirect(url_for('edit_event', event_id=event_id))
         
-        try:
-            event_date = datetime.strptime(date_str, '%Y-%m-%dT%H:%M')
-            max_participants = int(max_participants)
-            
-            if max_participants < 1:
-                flash('Maximum participants must be at least 1.', 'error')
-                return render_template('edit_event.html', event=event)
-            
-            # Check if reducing max participants below current registrations
-            if max_participants < event.current_participants:
-                flash(f'Cannot reduce max participants to {max_participants}. Current registrations: {event.current_participants}', 'error')
-                return render_template('edit_event.html', event=event)
-            
-        except ValueError:
+        if not max_participants.isdecimal():
+            flash('Invalid date format or participant count.', 'error')
+            return redirect(url_for('edit_event', event_id=event_id))
+        max_participants = int(max_participants)
+        
+        event_date = parse_event_date(date_str)
+        if event_date is None:
             flash('Invalid date format or participant count.', 'error')
-            return render_template('edit_event.html', event=event)
+            return redirect(url_for('edit_event', event_id=event_id))
+        
+        if max_participants < 1:
+            flash('Maximum participants must be at least 1.', 'error')
+            return redirect(url_for('edit_event', event_id=event_id))
+        
+        # Check if reducing max participants below current registrations
+        if max_participants < event.current_participants:
+            flash(f'Cannot reduce max participants to {max_participants}. Current registrations: {event.current_participants}', 'error')
+            return redirect(url_for('edit_event', event_id=event_id))
         
         # Update event
         event.title = title
@@ -472,11 +679,12 @@ def edit_event(event_id):
         try:
             db.session.commit()
             flash(f'Event "{title}" updated successfully!', 'success')
-            return redirect(url_for('admin_dashboard'))
+            return redirect(ADMIN_DASHBOARD_URL)
         except Exception as e:
             db.session.rollback()
             logging.error(f"Error updating event: {e}")
             flash('Failed to update event. Please try again.', 'error')
+            return redirect(url_for('edit_event', event_id=event_id))
     
     return render_template('edit_event.html', event=event)
 
@@ -484,9 +692,9 @@ def edit_event(event_id):
 def delete_event(event_id):
     if not is_admin_logged_in():
         flash('Please login to access admin features.', 'error')
-        return redirect(url_for('admin_login'))
+        return redirect(ADMIN_LOGIN_URL)
     
-    event = Event.query.get_or_404(event_id)
+    event = db.get_or_404(Event, event_id)
     
     try:
         # Delete all registrations for this event (cascade should handle this)
@@ -498,17 +706,35 @@ def delete_event(event_id):
         logging.error(f"Error deleting event: {e}")
         flash('Failed to delete event. Please try again.', 'error')
     
-    return redirect(url_for('admin_dashboard'))
+    return redirect(ADMIN_DASHBOARD_URL)
 
 @app.route('/admin/events/<int:event_id>/participants')
 def view_participants(event_id):
     if not is_admin_logged_in():
         flash('Please login to access admin features.', 'error')
-        return redirect(url_for('admin_login'))
-    
-    event = Event.query.get_or_404(event_id)
-    
-    registrations = Registration.query.filter_by(event_id=event_id).order_by(Registration.timestamp).all()
+        return redirect(ADMIN_LOGIN_URL)
+    
+    # The event, its registrations and their students in one round trip (outer joins, so an
+    # event without registrations still loads), fetching only the student columns the list shows;
+    # registration.event then resolves from the identity map instead of joining events again
+    event = db.session.execute(
+        select(Event)
+        .outerjoin(Event.registrations)
+        .outerjoin(Registration.student)
+        .options(
+            contains_eager(Event.registrations).options(
+                contains_eager(Registration.student).load_only(
+                    Student.name, Student.roll_number, Student.email, Student.department
+                ),
+                lazyload(Registration.event)
+            )
+        )
+        .where(Event.event_id == event_id)
+        .order_by(Registration.timestamp)
+    ).unique().scalar_one_or_none()
+    if event is None:
+        abort(404)
+    registrations = event.registrations
     
     return render_template('participants.html', event=event, registrations=registrations)
     
@@ -524,19 +750,37 @@ def view_participants(event_id):
 def logout():
     session.clear()
     flash('You have been logged out successfully.', 'success')
-    return redirect(url_for('index'))
+    return redirect(INDEX_URL)
 
 @app.route('/admin/logout')
 def admin_logout():
     session.clear()
     flash('Admin logged out successfully.', 'success')
-    return redirect(url_for('index'))
+    return redirect(INDEX_URL)
+
+# Redirect targets without URL parameters, resolved once instead of on every redirect
+with app.test_request_context():
+    INDEX_URL = url_for('index')
+    SIGNUP_URL = url_for('signup')
+    LOGIN_URL = url_for('login')
+    STUDENT_DASHBOARD_URL = url_for('student_dashboard')
+    MY_REGISTRATIONS_URL = url_for('my_registrations')
+    ADMIN_LOGIN_URL = url_for('admin_login')
+    ADMIN_DASHBOARD_URL = url_for('admin_dashboard')
+    ADD_EVENT_URL = url_for('add_event')
+
+def create_missing_indexes():
+    # create_all skips existing tables, so also add any indexes declared since they were created
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
 
 def initialize_sample_data():
     """Initialize the database with events and admin account"""
     try:
         # Create all tables first
         db.create_all()
+        create_missing_indexes()
         
         # Check if data already exists
         if Event.query.count() > 0:
@@ -546,12 +790,12 @@ def initialize_sample_data():
         print("Initializing TechNova events...")
         
         # Create default admin
-        if not Admin.query.filter_by(username='admin').first():
-            default_admin = Admin(
-                username='admin',
-                password_hash=generate_password_hash('admin123')
+        if db.session.scalar(select(Admin.admin_id).filter_by(username='admin')) is None:
+            db.session.execute(
+                insert_for_dialect(Admin)
+                .values(username='admin', password_hash=hash_password('admin123'))
+                .on_conflict_do_nothing(index_elements=['username'])
             )
-            db.session.add(default_admin)
         
         # TechNova Engineering Competition Events
         events_data = [
@@ -637,10 +881,8 @@ def initialize_sample_data():
             }
         ]
         
-        # Add events to database
-        for event_data in events_data:
-            event = Event(**event_data)
-            db.session.add(event)
+        # Add events to database in one executemany INSERT
+        db.session.execute(insert(Event), events_data)
         
         # Commit changes
         db.session.commit()
@@ -653,11 +895,23 @@ def initialize_sample_data():
         print(f"❌ Error initializing events: {e}")
         logging.error(f"Error in initialize_sample_data: {e}")
 
-# Initialize database and sample data
-with app.app_context():
+@app.cli.command('init-db')
+def init_db_command():
+    """Create the tables and load the sample events"""
     initialize_sample_data()
 
+# Initialize database and sample data on the first run only. Once the database file exists,
+# startup skips create_all and the count query (`flask --app run_local init-db` redoes them)
+# but still adds any newly declared indexes, which create_all never applies to existing tables
+if not os.path.exists(os.path.join(app.instance_path, 'technova.db')):
+    with app.app_context():
+        initialize_sample_data()
+else:
+    with app.app_context():
+        create_missing_indexes()
+
 if __name__ == '__main__':
     print("\n🚀 Starting TechNova - Where Innovation Meets Future")
     print("📱 Access your portal at: http://127.0.0.1:5000")
-    app.run(host='127.0.0.1', port=5000, debug=True)
\ No newline at end of file
+    # Debugger and reloader only on request (FLASK_DEBUG=1); threads keep requests from queueing
+    app.run(host='127.0.0.1', port=5000, debug=os.environ.get('FLASK_DEBUG') == '1', threaded=True)
\ No newline at end of file